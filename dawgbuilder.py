@@ -102,9 +102,8 @@ import sys
 import codecs
 import time
 
-import binascii
 import struct
-import io
+import heapq
 
 from dawgdictionary import DawgDictionary
 
@@ -117,18 +116,34 @@ MAXLEN = 48  # Longest possible word to be processed
 SCRABBLE_MAXLEN = 15  # Longest possible word in a Scrabble database
 COMMON_MAXLEN = 12  # Longest words in common word list used by weakest robot
 
+# Cache of sort keys for edge prefixes. The prefixes are short and heavily
+# repeated (most of them are single letters), so they are only keyed once.
+_SORTKEY = dict()
+
+
+def _sk(prefix, _cache=_SORTKEY):
+    """ Return the Alphabet sort key of an edge prefix, memoized """
+    key = _cache.get(prefix)
+    if key is None:
+        key = _cache[prefix] = Alphabet.sortkey(prefix)
+    return key
+
 
 class _DawgNode:
 
     """ A _DawgNode is a node in a Directed Acyclic Word Graph (DAWG).
         It contains:
-            * a node identifier (a simple unique sequence number);
+            * a node identifier (a sequence number assigned when the node
+                is found to be unique, which is also its output line number);
             * a dictionary of edges (children) where each entry has a prefix
-                (following letter(s)) together with its child _DawgNode;
+                (following letter(s)) together with its child _DawgNode.
+                Once the node is found to be unique, and its edges thus
+                can no longer change, the dictionary is replaced by a compact
+                tuple of (prefix, node) pairs sorted by prefix;
             * and a Bool (final) indicating whether this node in the graph
                 also marks the end of a legal word.
 
-        A _DawgNode has a string representation which can be hashed to
+        A _DawgNode has a signature which can be hashed to
         determine whether it is identical to a previously encountered node,
         i.e. whether it has the same final flag and the same edges with
         prefixes leading to the same child nodes. This assumes
@@ -141,60 +156,75 @@ class _DawgNode:
 
     """
 
-    # Running count of node identifiers
-    # Zero is reserved for "None"
-    _nextid = 1
+    # Fixed attribute slots make nodes smaller and attribute access faster
+    __slots__ = ("id", "edges", "final")
 
     @staticmethod
     def sort_by_prefix(l):
         """ Return a list of (prefix, node) tuples sorted by prefix """
-        return sorted(l, key=lambda x: Alphabet.sortkey(x[0]))
+        return sorted(l, key=lambda x: _sk(x[0]))
+
+    @staticmethod
+    def edge_items(edges):
+        """ Return the (prefix, node) tuples of a dict of edges or a frozen edge tuple """
+        return edges.items() if isinstance(edges, dict) else edges
+
+    @staticmethod
+    def sorted_edges(edges):
+        """ Return the (prefix, node) tuples of a dict of edges or a frozen edge tuple,
+            sorted by prefix """
+        if isinstance(edges, dict):
+            return _DawgNode.sort_by_prefix(edges.items())
+        # Frozen edges are already sorted
+        return edges
 
     @staticmethod
     def stringify_edges(edges):
-        """ Utility function to create a compact descriptor string and hashable key for node edges """
+        """ Utility function to create a compact descriptor string for node edges """
         s = [
             prefix + ":" + ("0" if node is None else str(node.id))
-            for prefix, node in _DawgNode.sort_by_prefix(edges.items())
+            for prefix, node in _DawgNode.sorted_edges(edges)
         ]
         return "_".join(s)
 
-    def __init__(self):
-        self.id = _DawgNode._nextid
-        _DawgNode._nextid += 1
-        self.edges = dict()
+    def __init__(self, edges=None):
+        self.id = None  # Assigned by _Dawg when the node is found to be unique
+        # The edge dict may be passed in by the caller, e.g. from a pool of
+        # recycled empty dicts
+        self.edges = dict() if edges is None else edges
         self.final = False
-        self._strng = None  # Cached string representation of this node
-        self._hash = None  # Hash of the final flag and a shallow traversal of the edges
+
+    def signature(self):
+        """ Return a hashable key consisting of the final flag and a shallow
+            traversal of the edges. The edges are sorted by plain string order,
+            which is sufficient to make the key canonical. """
+        return (
+            self.final,
+            tuple(
+                sorted(
+                    (prefix, 0 if node is None else node.id)
+                    for prefix, node in _DawgNode.edge_items(self.edges)
+                )
+            ),
+        )
+
+    def freeze(self):
+        """ Replace the edge dictionary with a compact tuple of (prefix, node)
+            pairs, sorted by prefix. This is done once the node is known to
+            be unique, after which its edges do not change. """
+        self.edges = tuple(_DawgNode.sort_by_prefix(self.edges.items()))
 
     def __str__(self):
-        """ Return a string representation of this node, cached if possible """
-        if self._strng is None:
-            # We don't have a cached string representation: create it
-            edges = _DawgNode.stringify_edges(self.edges)
-            self._strng = "|_" + edges if self.final else edges
-        return self._strng
-
-    def __hash__(self):
-        """ Return a hash of this node, cached if possible """
-        if self._hash is None:
-            # We don't have a cached hash: create it
-            self._hash = self.__str__().__hash__()
-        return self._hash
-
-    def __eq__(self, other):
-        """ Use string equality based on the string representation of nodes """
-        return self.__str__() == other.__str__()
-
-    def reset_id(self, newid):
-        """ Set a new id number for this node. This forces a reset of the cached data. """
-        self.id = newid
-        self._strng = None
-        self._hash = None
+        """ Return a string representation of this node, as written to text files """
+        edges = _DawgNode.stringify_edges(self.edges)
+        return "|_" + edges if self.final else edges
 
 
 class _Dawg:
 
+    # Number of nodes per write() call when outputting text
+    WRITE_BATCH = 8192
+
     def __init__(self):
         self._lastword = ""
         self._lastlen = 0
@@ -202,12 +232,14 @@ class _Dawg:
         # Initialize empty list of starting dictionaries
         self._dicts = [None for _ in range(MAXLEN)]
         self._dicts[0] = self._root
-        # Initialize the result list of unique nodes
-
-        # Keep a list of the values inserted too. Note that using
-        # OrderedDict raises an exception while enumerating the values
-        # (presumably because the dictionary has been altered).
+        # Initialize the result dict of unique nodes, keyed by node signature.
+        # The insertion order of the dict is the output order of the nodes.
         self._unique_nodes = dict()
+        # Id of the next unique node. Zero is reserved for "None" and
+        # 1 is the line number of the root in text output files, so we start with 2.
+        self._next_id = 2
+        # Pool of empty edge dicts, recycled from nodes that have been collapsed
+        self._dict_pool = []
 
     def _collapse_branch(self, parent, prefix, node):
         """ Attempt to collapse a single branch of the tree """
@@ -223,6 +255,7 @@ class _Dawg:
             assert node.final
             # We don't need to put a vertical bar (final marker) at the end of the prefix; it's implicit
             parent[prefix] = None
+            self._dict_pool.append(di)
             return
 
         # Attempt to collapse simple chains of single-letter nodes
@@ -232,31 +265,42 @@ class _Dawg:
 
         if len(di) == 1:
             # Only one child: we can collapse
-            lastd = None
-            tail = None
-            for ch, nx in di.items():
-                # There will only be one iteration of this loop
-                tail = ch
-                lastd = nx
+            ((tail, lastd),) = di.items()
             # Delete the child node and put a string of prefix characters into the root instead
             del parent[prefix]
+            di.clear()
+            self._dict_pool.append(di)
             if node.final:
                 tail = "|" + tail
-            prefix += tail
-            parent[prefix] = lastd
-            node = lastd
+            # Multi-letter prefixes recur throughout the graph: intern them
+            # so that equal prefixes share a single string object
+            parent[sys.intern(prefix + tail)] = lastd
+            # The child has already been collapsed, including any chain of
+            # single-edge nodes below it, so it is either None or a unique
+            # node: there is nothing more to do
+            return
 
         # If a node with the same signature (key) has already been generated,
         # i.e. having the same final flag and the same edges leading to the same
         # child nodes, replace the edge leading to this node with an edge
         # to the previously generated node.
 
-        if node in self._unique_nodes:
+        sig = node.signature()
+        existing = self._unique_nodes.get(sig)
+        if existing is not None:
             # Signature matches a previously generated node: replace the edge
-            parent[prefix] = self._unique_nodes[node]
+            parent[prefix] = existing
+            di.clear()
+            self._dict_pool.append(di)
         else:
-            # This is a new, unique signature: store it in the dictionary of unique nodes
-            self._unique_nodes[node] = node
+            # This is a new, unique signature: number the node and
+            # store it in the dictionary of unique nodes
+            node.id = self._next_id
+            self._next_id += 1
+            node.freeze()
+            di.clear()
+            self._dict_pool.append(di)
+            self._unique_nodes[sig] = node
 
     def _collapse(self, edges):
         """ Collapse and optimize the edges in the parent dict """
@@ -272,12 +316,16 @@ class _Dawg:
 
     def _collapse_to(self, divergence):
         """ Collapse the tree backwards from the point of divergence """
-        j = self._lastlen
-        while j > divergence:
-            if self._dicts[j]:
-                self._collapse(self._dicts[j])
-                self._dicts[j] = None
-            j -= 1
+        levels = self._dicts
+        lastlen = self._lastlen
+        if lastlen <= divergence:
+            return
+        for j in range(lastlen, divergence, -1):
+            level = levels[j]
+            if level:
+                self._collapse(level)
+        # Clear all the collapsed levels in one go
+        levels[divergence + 1 : lastlen + 1] = [None] * (lastlen - divergence)
 
     def add_word(self, wrd):
         """ Add a word to the DAWG.
@@ -297,24 +345,28 @@ class _Dawg:
                 "Word exceeds maximum length of {0} letters".format(MAXLEN)
             )
         # First see how many letters we have in common with the
-        # last word we processed
+        # last word we processed (zip() stops at the end of the shorter word)
         i = 0
-        while i < lenword and i < self._lastlen and wrd[i] == self._lastword[i]:
+        for a, b in zip(wrd, self._lastword):
+            if a != b:
+                break
             i += 1
         # Start from the point of last divergence in the tree
         # In the case of backtracking, collapse all previous outstanding branches
         self._collapse_to(i)
         # Add the (divergent) rest of the word
-        d = self._dicts[i]  # Note that self._dicts[0] is self._root
+        dicts = self._dicts
+        pool = self._dict_pool
+        d = dicts[i]  # Note that self._dicts[0] is self._root
         nd = None
         while i < lenword:
-            nd = _DawgNode()
+            nd = _DawgNode(pool.pop() if pool else None)
             # Add a new starting letter to the working dictionary,
             # with a fresh node containing an empty dictionary of subsequent letters
             d[wrd[i]] = nd
             d = nd.edges
             i += 1
-            self._dicts[i] = d
+            dicts[i] = d
         # We are at the node for the final letter in the word: mark it as such
         if nd is not None:
             nd.final = True
@@ -328,17 +380,15 @@ class _Dawg:
         self._lastword = ""
         self._lastlen = 0
         self._collapse(self._root)
-        # Renumber the nodes for a tidier graph and more compact output
-        # 1 is the line number of the root in text output files, so we start with 2
-        ix = 2
-        for n in self._unique_nodes.values():
-            if n is not None:
-                n.reset_id(ix)
-                ix += 1
+        self._dict_pool = []
+        # The node signatures are only needed while the graph is being built.
+        # Release them by re-keying the unique nodes by id, which keeps their
+        # (output) order intact.
+        self._unique_nodes = {node.id: node for node in self._unique_nodes.values()}
 
     def _dump_level(self, level, d):
         """ Dump a level of the tree and continue into sublevels by recursion """
-        for ch, nx in d.items():
+        for ch, nx in _DawgNode.edge_items(d):
             s = " " * level + ch
             if nx and nx.final:
                 s += "|"
@@ -360,7 +410,7 @@ class _Dawg:
             if n is not None:
                 # We don't use ix for the time being
                 print("Node {0}{1}".format(n.id, "|" if n.final else ""))
-                for prefix, nd in n.edges.items():
+                for prefix, nd in n.edges:
                     print(
                         "   Edge {0} to node {1}".format(
                             prefix, 0 if nd is None else nd.id
@@ -384,7 +434,7 @@ class _Dawg:
         chars = 0
         for n in self._unique_nodes.values():
             if n is not None:
-                for prefix in n.edges:
+                for prefix, _ in n.edges:
                     # Add the length of all prefixes to the edge, minus the vertical bar
                     # '|' which indicates a final character within the prefix
                     chars += len(prefix) - prefix.count("|")
@@ -392,10 +442,20 @@ class _Dawg:
 
     def write_packed(self, packer):
         """ Write the optimized DAWG to a packer """
+        root_edges = _DawgNode.sorted_edges(self._root)
+        # Let the packer calculate the node locations up front,
+        # allowing it to write its output in a single sequential pass
+        packer.locate(
+            [prefix for prefix, _ in root_edges],
+            (
+                (node.id, [prefix for prefix, _ in node.edges])
+                for node in self._unique_nodes.values()
+                if node is not None
+            ),
+        )
         packer.start(len(self._root))
         # Start with the root edges
-        sortfunc = _DawgNode.sort_by_prefix
-        for prefix, nd in sortfunc(self._root.items()):
+        for prefix, nd in root_edges:
             if nd is None:
                 packer.edge(0, prefix)
             else:
@@ -403,7 +463,8 @@ class _Dawg:
         for node in self._unique_nodes.values():
             if node is not None:
                 packer.node_start(node.id, node.final, len(node.edges))
-                for prefix, nd in sortfunc(node.edges.items()):
+                # The edges of unique nodes are frozen, i.e. already sorted
+                for prefix, nd in node.edges:
                     if nd is None:
                         packer.edge(0, prefix)
                     else:
@@ -416,26 +477,39 @@ class _Dawg:
         # +1 to include the root in the node count
         print(
             "Output graph has {0} nodes"
-            .format(len(self._unique_nodes))
+            .format(len(self._unique_nodes) + 1)
         )
         # We don't have to write node ids since they correspond to line numbers.
         # The root is always in the first line and the first node after the root has id 2.
         # Start with the root edges
         stream.write(_DawgNode.stringify_edges(self._root) + "\n")
+        # Write the nodes in batches to cut down on the number of write() calls
+        batch = []
         for node in self._unique_nodes.values():
             if node is not None:
-                stream.write(node.__str__() + "\n")
+                batch.append(node.__str__())
+                if len(batch) >= _Dawg.WRITE_BATCH:
+                    batch.append("")  # Final newline
+                    stream.write("\n".join(batch))
+                    batch.clear()
+        if batch:
+            batch.append("")
+            stream.write("\n".join(batch))
 
 
 class _BinaryDawgPacker:
 
     """ _BinaryDawgPacker packs the DAWG data to a byte stream.
 
-        !!! This is not fully implemented and not currently used by the
-        !!! DawgDictionary class in dawgdictionary.py
+        The packed format is read by the PackedDawgDictionary class
+        in dawgdictionary.py, which navigates it directly from a
+        memory-mapped file.
 
         The stream format is as follows:
 
+        BYTE Number of root edges
+        For each root edge:
+            (Edge format as below)
         For each node:
             BYTE Node header
                 [feeeeeee]
@@ -457,41 +531,60 @@ class _BinaryDawgPacker:
                                     coded as an index into AÁBDÐEÉFGHIÍJKLMNOÓPRSTUÚVXYÝÞÆÖ
                 DWORD Offset of child node
 
+        The locations of all nodes are calculated up front by locate(),
+        so the stream is written sequentially, without any seeking back
+        to fix up forward references.
+
     """
 
     CODING_UCASE = Alphabet.upper
     CODING_LCASE = Alphabet.order
 
+    # Map of both lower and upper case letters to their coding index
+    _CHAR_CODE = {c: i for i, c in enumerate(CODING_UCASE)}
+    _CHAR_CODE.update((c, i) for i, c in enumerate(CODING_LCASE))
+
+    # Preallocated single-byte bytes objects, indexed by byte value
+    _BYTE = tuple(bytes((i,)) for i in range(256))
+
     def __init__(self, stream):
         self._stream = stream
-        self._byte_struct = struct.Struct("<B")
         self._loc_struct = struct.Struct("<L")
-        # _locs is a dict of already written nodes and their stream locations
+        # Reusable scratch buffers, to avoid allocating new bytes objects
+        # for every header and location written to the stream
+        self._scratch = bytearray(4)
+        self._edge_buf = bytearray()
+        # _locs is a dict of node ids and their stream locations
         self._locs = dict()
-        # _fixups is a dict of node ids and file positions where the
-        # node id has been referenced without knowing where the node is
-        # located
-        self._fixups = dict()
+
+    @staticmethod
+    def edge_size(prefix):
+        """ Return the number of bytes used to encode an edge with the given prefix """
+        # Vertical bars are folded into the final bit of the preceding character
+        n = len(prefix) - prefix.count(u"|")
+        # Header byte, prefix bytes (unless a single-letter prefix) and child location
+        return (1 if n == 1 else 1 + n) + 4
+
+    def locate(self, root_prefixes, nodes):
+        """ Calculate the stream location of every node before anything is written.
+            root_prefixes is a list of the root edge prefixes, and nodes is an
+            iterable of (ident, prefixes) tuples in output order. """
+        edge_size = _BinaryDawgPacker.edge_size
+        # The root section consists of the root edge count and the root edges
+        pos = self._stream.tell() + 1 + sum(edge_size(p) for p in root_prefixes)
+        for ident, prefixes in nodes:
+            self._locs[ident] = pos
+            # Node header followed by the edges
+            pos += 1 + sum(edge_size(p) for p in prefixes)
 
     def start(self, num_root_edges):
         # The stream starts off with a single byte containing the
         # number of root edges
-        self._stream.write(self._byte_struct.pack(num_root_edges))
+        self._stream.write(_BinaryDawgPacker._BYTE[num_root_edges])
 
     def node_start(self, ident, final, num_edges):
-        pos = self._stream.tell()
-        if ident in self._fixups:
-            # We have previously output references to this node without
-            # knowing its location: fix'em now
-            for fix in self._fixups[ident]:
-                self._stream.seek(fix)
-                self._stream.write(self._loc_struct.pack(pos))
-            self._stream.seek(pos)
-            del self._fixups[ident]
-        # Remember where we put this node
-        self._locs[ident] = pos
         self._stream.write(
-            self._byte_struct.pack((0x80 if final else 0x00) | (num_edges & 0x7F))
+            _BinaryDawgPacker._BYTE[(0x80 if final else 0x00) | (num_edges & 0x7F)]
         )
 
     def node_end(self, ident):
@@ -500,65 +593,34 @@ class _BinaryDawgPacker:
     def edge(self, ident, prefix):
         b = []
         last = None
+        char_code = _BinaryDawgPacker._CHAR_CODE
         for c in prefix:
             if c == u"|":
                 last |= 0x80
             else:
                 if last is not None:
                     b.append(last)
-                try:
-                    last = _BinaryDawgPacker.CODING_LCASE.index(c)
-                except ValueError:
-                    last = _BinaryDawgPacker.CODING_UCASE.index(c)
+                last = char_code[c]
         b.append(last)
 
+        # Assemble the entire edge in a single (reused) buffer and write it in one go
+        buf = self._edge_buf
+        buf.clear()
         if len(b) == 1:
             # Save space on single-letter prefixes
-            self._stream.write(self._byte_struct.pack(b[0] | 0x40))
-        else:
-            self._stream.write(self._byte_struct.pack(len(b) & 0x3F))
-            for by in b:
-                self._stream.write(self._byte_struct.pack(by))
-        if ident == 0:
-            self._stream.write(self._loc_struct.pack(0))
-        elif ident in self._locs:
-            # We've already written the node and know where it is: write its location
-            self._stream.write(self._loc_struct.pack(self._locs[ident]))
+            buf.append(b[0] | 0x40)
         else:
-            # This is a forward reference to a node we haven't written yet:
-            # reserve space for the node location and add a fixup
-            pos = self._stream.tell()
-            self._stream.write(
-                self._loc_struct.pack(0xFFFFFFFF)
-            )  # Temporary - will be overwritten
-            if ident not in self._fixups:
-                self._fixups[ident] = []
-            self._fixups[ident].append(pos)
+            buf.append(len(b) & 0x3F)
+            buf.extend(b)
+        # The node locations are all known in advance, see locate()
+        loc = 0 if ident == 0 else self._locs[ident]
+        self._loc_struct.pack_into(self._scratch, 0, loc)
+        buf += self._scratch
+        self._stream.write(buf)
 
     def finish(self):
-        # Clear the temporary fixup stuff from memory
+        # Clear the node locations from memory
         self._locs = dict()
-        self._fixups = dict()
-
-    def dump(self):
-        buf = self._stream.getvalue()
-        print("Total of {0} bytes".format(len(buf)))
-        s = binascii.hexlify(buf)
-        BYTES_PER_LINE = 16
-        CHARS_PER_LINE = BYTES_PER_LINE * 2
-        i = 0
-        addr = 0
-        lens = len(s)
-        while i < lens:
-            line = s[i : i + CHARS_PER_LINE]
-            print(
-                "{0:08x}: {1}".format(
-                    addr,
-                    " ".join([line[j : j + 2] for j in range(0, len(line) - 1, 2)]),
-                )
-            )
-            i += CHARS_PER_LINE
-            addr += BYTES_PER_LINE
 
 
 class DawgBuilder:
@@ -577,51 +639,23 @@ class DawgBuilder:
     class _InFile(object):
         """ InFile represents a single sorted input file. """
 
-        def __init__(self, relpath, fname):
-            self._eof = False
-            self._nxt = None
-            self._key = None  # Sortkey for self._nxt
+        def __init__(self, relpath, fname, sortkey=Alphabet.sortkey):
+            self._sortkey = sortkey
             fpath = os.path.abspath(os.path.join(relpath, fname))
-            self._fin = codecs.open(fpath, mode="r", encoding="utf-8")
+            # Universal newline mode translates CRLF (Windows-style)
+            # line endings to plain LF (Unix-style)
+            self._fin = open(fpath, mode="r", encoding="utf-8", buffering=1 << 20)
             print("Opened input file {0}".format(fpath))
-            self._init()
-
-        def _init(self):
-            # Read the first word from the file to initialize the iteration
-            self.read_word()
-
-        def read_word(self):
-            """ Read lines until we have a legal word or EOF """
-            while True:
-                try:
-                    line = next(self._fin)
-                except StopIteration:
-                    # We're done with this file
-                    self._eof = True
-                    return False
-                if line.endswith("\r\n"):
-                    # Cut off trailing CRLF (Windows-style)
-                    line = line[0:-2]
-                elif line.endswith("\n"):
-                    # Cut off trailing LF (Unix-style)
-                    line = line[0:-1]
+
+        def __iter__(self):
+            """ Generate (sortkey, word) tuples for the legal words in the file, lazily """
+            sortkey = self._sortkey
+            for line in self._fin:
+                # Cut off the trailing newline
+                line = line.rstrip("\n")
                 if line and len(line) < MAXLEN:
                     # Valid word
-                    self._nxt = line
-                    self._key = Alphabet.sortkey(line)
-                    return True
-
-        def next_word(self):
-            """ Returns the next available word from this input file """
-            return None if self._eof else self._nxt
-
-        def next_key(self):
-            """ Returns the sort key of the next available word from this input file """
-            return None if self._eof else self._key
-
-        def has_word(self):
-            """ True if a word is available, or False if EOF has been reached """
-            return not self._eof
+                    yield (sortkey(line), line)
 
         def close(self):
             """ Close the associated file, if it is still open """
@@ -633,46 +667,26 @@ class DawgBuilder:
     class _InFileToBeSorted(_InFile):
         """ InFileToBeSorted represents an input file that should be pre-sorted in memory """
 
-        def __init__(self, relpath, fname):
+        def __init__(self, relpath, fname, sortkey=Alphabet.sortkey):
             # Call base class constructor
-            super(DawgBuilder._InFileToBeSorted, self).__init__(relpath, fname)
-
-        def _init(self):
-            """ Read the entire file and pre-sort it """
-            self._list = []
-            self._index = 0
+            super(DawgBuilder._InFileToBeSorted, self).__init__(relpath, fname, sortkey)
             try:
-                for line in self._fin:
-                    if line.endswith("\r\n"):
-                        # Cut off trailing CRLF (Windows-style)
-                        line = line[0:-2]
-                    elif line.endswith("\n"):
-                        # Cut off trailing LF (Unix-style)
-                        line = line[0:-1]
-                    if line and len(line) < MAXLEN:
-                        # Valid word
-                        self._list.append(line)
-            except StopIteration:
-                pass
+                # Read the whole file in one go; splitlines() takes care of
+                # both CRLF (Windows-style) and LF (Unix-style) line endings
+                lines = self._fin.read().splitlines()
             finally:
-                self._fin.close()
-                self._fin = None
-            self._len = len(self._list)
-            self._list.sort(key=Alphabet.sortkey)
-            self.read_word()
-
-        def read_word(self):
-            if self._index >= self._len:
-                self._eof = True
-                return False
-            self._nxt = self._list[self._index]
-            self._key = Alphabet.sortkey(self._nxt)
-            self._index += 1
-            return True
-
-        def close(self):
-            """ Close the associated file, if it is still open """
-            pass
+                self.close()
+            # Decorate each valid word with its sort key, so that the key
+            # is calculated only once per word, both for sorting and merging
+            sortkey = self._sortkey
+            self._list = [
+                (sortkey(line), line) for line in lines if line and len(line) < MAXLEN
+            ]
+            self._list.sort()
+
+        def __iter__(self):
+            """ Generate (sortkey, word) tuples from the pre-sorted list """
+            return iter(self._list)
 
     def _load(self, relpath, inputs, removals, word_filter):
         """ Load word lists into the DAWG from one or more static text files,
@@ -698,48 +712,34 @@ class DawgBuilder:
         # Enforce strict ascending lexicographic order
         lastword = None
         lastkey = None
+        # If the collation of the Alphabet coincides with plain code point order,
+        # the words can be compared directly without calculating sort keys.
+        # (str() simply returns the word itself.)
+        sortkey = str if Alphabet.is_codepoint_order() else Alphabet.sortkey
         # Open the input files. The first (main) input file is assumed
         # to be pre-sorted. Other input files are sorted in memory before
-        # being used.
+        # being used. (They are small, and as the sort key calculation holds
+        # the GIL, sorting them in worker threads gains nothing.)
         infiles = [
-            DawgBuilder._InFile(relpath, f)
+            DawgBuilder._InFile(relpath, f, sortkey)
             if ix == 0
-            else DawgBuilder._InFileToBeSorted(relpath, f)
+            else DawgBuilder._InFileToBeSorted(relpath, f, sortkey)
             for ix, f in enumerate(inputs)
         ]
         # Open the removal file, if any
         if removals is None:
-            removal = None
+            removal = iter(())
         else:
-            removal = DawgBuilder._InFileToBeSorted(relpath, removals)
-        remove_key = None if removal is None else removal.next_key()
-        # Merge the inputs
-        while True:
-            smallest = None
-            # Find the smallest next word among the input files
-            for f in infiles:
-                if f.has_word():
-                    if smallest is None:
-                        smallest = f
-                        key_smallest = smallest.next_key()
-                    else:
-                        # Use the sort ordering of the current locale to compare words
-                        key_f = f.next_key()
-                        if key_f == key_smallest:
-                            # We have the same word in two files: make sure we don't add it twice
-                            f.read_word()
-                            incount += 1
-                            duplicates += 1
-                        elif key_f < key_smallest:
-                            # New smallest word
-                            smallest = f
-                            key_smallest = key_f
-            if smallest is None:
-                # All files exhausted: we're done
-                break
-            # We have the smallest word
-            word = smallest.next_word()
-            key = key_smallest
+            removal = iter(DawgBuilder._InFileToBeSorted(relpath, removals, sortkey))
+        remove_key, _ = next(removal, (None, None))
+        # Merge the inputs into a single sorted stream of (sortkey, word) tuples.
+        # Words that occur in more than one file appear consecutively in the
+        # stream and are caught by the duplicate check below.
+        # Note: the merge is deliberately done in this thread. Reading, decoding
+        # and key calculation are CPU-bound Python code, as is adding words to
+        # the graph, so a separate producer thread feeding a queue only makes
+        # the two contend for the GIL (measured at about 50% slower).
+        for key, word in heapq.merge(*infiles):
             incount += 1
             if lastkey and lastkey >= key:
                 # Something appears to be wrong with the input sort order.
@@ -758,12 +758,10 @@ class DawgBuilder:
                 # This word passes the filter: check the removal list, if any
                 while remove_key is not None and remove_key < key:
                     # Skip past words in the removal file as needed
-                    removal.read_word()
-                    remove_key = removal.next_key()
+                    remove_key, _ = next(removal, (None, None))
                 if remove_key is not None and remove_key == key:
                     # Found a word to be removed
-                    removal.read_word()
-                    remove_key = removal.next_key()
+                    remove_key, _ = next(removal, (None, None))
                     removed += 1
                 else:
                     # Not a word to be removed: add it to the graph
@@ -775,11 +773,8 @@ class DawgBuilder:
                 # Progress indicator
                 print("{0}...".format(incount), end="\r")
                 sys.stdout.flush()
-            # Advance to the next word in the file we read from
-            smallest.read_word()
         # Done merging: close all files
         for f in infiles:
-            assert not f.has_word()
             f.close()
         # Complete and clean up
         self._dawg.finish()
@@ -791,20 +786,12 @@ class DawgBuilder:
     def _output_binary(self, relpath, output):
         """ Write the DAWG to a flattened binary output file with extension '.dawg' """
         assert self._dawg is not None
-        # !!! Experimental / debugging...
-        f = io.BytesIO()
-        # Create a packer to flatten the tree onto a binary stream
-        p = _BinaryDawgPacker(f)
-        # Write the tree using the packer
-        self._dawg.write_packed(p)
-        # Dump the packer contents to stdout for debugging
-        p.dump()
-        # Write packed DAWG to binary file
-        with open(
-            os.path.abspath(os.path.join(relpath, output + ".dawg")), "wb"
-        ) as of:
-            of.write(f.getvalue())
-        f.close()
+        fname = os.path.abspath(os.path.join(relpath, output + ".dawg"))
+        with open(fname, "wb", buffering=1 << 20) as of:
+            # Create a packer to flatten the tree onto the binary file.
+            # The packer writes sequentially, so no in-memory copy is needed.
+            p = _BinaryDawgPacker(of)
+            self._dawg.write_packed(p)
 
     def _output_text(self, relpath, output):
         """ Write the DAWG to a text output file with extension '.text.dawg' """
@@ -814,7 +801,13 @@ class DawgBuilder:
             self._dawg.write_text(fout)
 
     def build(
-        self, inputs, output, relpath="resources", word_filter=None, removals=None
+        self,
+        inputs,
+        output,
+        relpath="resources",
+        word_filter=None,
+        removals=None,
+        packed=False,
     ):
         """ Build a DAWG from input file(s) and write it to the output file(s) (potentially in multiple formats).
             The input files are assumed to be individually sorted in correct ascending alphabetical
@@ -824,6 +817,8 @@ class DawgBuilder:
         # output is an output file name without file type suffix (extension);
         # ".dawg" and ".text.dawg" will be appended depending on output formats
         # relpath is a relative path to the input and output files
+        # packed is True if the binary '.dawg' file for PackedDawgDictionary
+        # should also be written (requires all letters to be in Alphabet.order)
         print("DawgBuilder starting...")
         if (not inputs) or (not output):
             # Nothing to do
@@ -833,8 +828,10 @@ class DawgBuilder:
         # print("Dumping...")
         # self._dawg.dump()
         print("Outputting...")
-        # self._output_binary(relpath, output) # Not used for now
         self._output_text(relpath, output)
+        if packed:
+            # Written after the text file, so that the binary file is seen as current
+            self._output_binary(relpath, output)
         print("DawgBuilder done")
 
 
@@ -914,6 +911,7 @@ def run_skrafl():
         "resources",  # Subfolder of input and output files
         filter_skrafl,  # Word filter function to apply
         "ordalisti.remove.txt",  # Words to remove
+        packed=True,  # Also write ordalisti.dawg for PackedDawgDictionary
     )
     t1 = time.time()
     print("Build took {0:.2f} seconds".format(t1 - t0))
@@ -12,12 +12,23 @@
     The graph is pre-built using the code in dawgbuilder.py and stored
     in a text-based file to be loaded at run-time by DawgDictionary.
 
-    The main class supports three fundamental query functions:
+    The graph can alternatively be stored in a packed binary file, which
+    is memory-mapped by PackedDawgDictionary and navigated in place,
+    decoding nodes lazily as they are visited. Loading is then practically
+    instantaneous, and only the visited part of the graph occupies memory.
+    PackedDawgDictionary supports the same query functions as DawgDictionary,
+    but it cannot be stored to or loaded from a pickle file.
+
+    The main class supports the following fundamental query functions:
 
     DawgDictionary.find(word)
         Returns True if the word is found in the dictionary, or False if not.
         The __contains__ operator is supported, so "'myword' in dawgdict" also works.
 
+    DawgDictionary.find_many(words)
+        Returns a list of True/False values, one for each of the given words,
+        sharing the work of walking the graph along common prefixes.
+
     DawgDictionary.find_matches(pattern)
         Returns a list of words that match the pattern. The pattern can contain
         wildcards ('?'). For example, result = dawgdict.find_matches("ex???") returns
@@ -38,12 +49,13 @@
         as documented in comments for the navigate() function.
 
     DawgDictionary.FindNavigator(word)
-        A navigation class to find words by exact match. Used by DawgDictionary.find()
+        A navigation class to find words by exact match. DawgDictionary.find()
+        walks the graph directly for speed, but is equivalent to using this class.
 
     DawgDictionary.PermutationNavigator(rack, minlen)
         A navigation class to find rack permutations. Used by DawgDictionary.find_permutations()
 
-    DawgDictionary.MatchNavigator(rack, minlen)
+    DawgDictionary.MatchNavigator(pattern)
         A navigation class to find words matching a pattern. Used by DawgDictionary.find_matches()
 
     See also comments in dawgbuilder.py
@@ -53,74 +65,215 @@
 """
 
 import os
-import codecs
 import threading
 import logging
 import time
 import sys
 import pickle
+import mmap
+import struct
+import array
+import gc
+import contextlib
 
 from languages import Alphabet
 
 
+@contextlib.contextmanager
+def _gc_paused():
+    """ Suspend the cyclic garbage collector while a graph is being built.
+        The graph consists of a large number of container objects, none of
+        them garbage, which would otherwise trigger many futile collections. """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class _Node:
 
-    """ This class must be at module level for pickling """
+    """ A node in the DAWG graph. This class must be at module level
+        for loading older pickle files. """
+
+    __slots__ = ("final", "firsts", "prefixes", "children")
 
     def __init__(self):
         self.final = False
-        self.edges = dict()
+        # The outgoing edges are stored as parallel sequences rather than
+        # as a tuple per edge, which saves a sizable amount of memory.
+        # The first characters of the edges, as a string: str.find() on
+        # this string locates the edge for a given letter.
+        self.firsts = ""
+        # The prefixes of the edges, in the same order
+        self.prefixes = ()
+        # The nodes that the edges lead to, or None for final edges
+        self.children = ()
+
+    def set_edges(self, prefixes, children):
+        """ Set the outgoing edges of the node from sequences
+            of prefixes and corresponding next nodes """
+        self.firsts = "".join([prefix[0] for prefix in prefixes])
+        self.prefixes = tuple(prefixes)
+        self.children = tuple(children)
+
+    def __setstate__(self, state):
+        """ Restore a node from an older pickle file, where nodes had a __dict__
+            with the edges in a dict of prefix to next node """
+        self.final = state["final"]
+        edges = state["edges"]
+        self.set_edges(list(edges), list(edges.values()))
+
+
+class _PackedNode:
+
+    """ A node in a packed (binary) DAWG, as written by _BinaryDawgPacker
+        in dawgbuilder.py. The outgoing edges are decoded from the
+        underlying buffer upon first access, and cached thereafter. """
+
+    __slots__ = ("final", "firsts", "prefixes", "children", "_dawg", "_loc")
+
+    _EDGE_SLOTS = frozenset(("firsts", "prefixes", "children"))
+
+    def __init__(self, dawg, loc, final):
+        self.final = final
+        self._dawg = dawg
+        self._loc = loc
+        # The edge slots are left unset until first accessed: see __getattr__()
+
+    def __getattr__(self, name):
+        """ Called only for unset attributes, i.e. when the edges of
+            the node are accessed for the first time """
+        if name not in self._EDGE_SLOTS:
+            raise AttributeError(name)
+        # Decode the edges and store them in their slots, so that
+        # subsequent accesses are plain attribute lookups
+        prefixes, children = self._dawg._decode_edges(self._loc)
+        self.firsts = "".join([prefix[0] for prefix in prefixes])
+        self.prefixes = prefixes
+        self.children = children
+        return getattr(self, name)
+
+
+class _DawgBase:
+
+    """ The query interface shared by DawgDictionary and PackedDawgDictionary.
+        Subclasses implement find() and _root_node(), which returns the root
+        node of the graph, or None if no graph has been loaded. """
+
+    def __init__(self):
+        # Lock to ensure that only one thread loads the dictionary
+        self._lock = threading.Lock()
+
+    def __contains__(self, word):
+        """ Enable simple lookup syntax: "word" in dawgdict """
+        return self.find(word)
+
+    def find_matches(self, pattern, sort=True):
+        """ Returns a list of words matching a pattern.
+            The pattern contains characters and '?'-signs denoting wildcards.
+            Characters are matched exactly, while the wildcards match any character.
+            The list is always in Alphabet.sortkey() (collation) order, since the
+            edges of each node are stored in that order; the sort parameter is
+            retained for compatibility only.
+        """
+        nav = MatchNavigator(pattern)
+        self.navigate(nav)
+        return nav.result()
+
+    def find_permutations(self, rack, minlen=0):
+        """ Returns a list of legal permutations of a rack of letters.
+            The list is sorted in descending order by permutation length.
+            The rack may contain question marks '?' as wildcards, matching all letters.
+            Question marks should be used carefully as they can
+            yield very large result sets.
+        """
+        nav = PermutationNavigator(rack, minlen)
+        self.navigate(nav)
+        return nav.result()
 
+    def navigate(self, nav):
+        """ A generic function to navigate through the DAWG under
+            the control of a navigation object.
 
-class DawgDictionary:
+            The navigation object should implement the following interface:
+
+            def push_edge(firstchar)
+                returns True if the edge should be entered or False if not
+            def accepting()
+                returns False if the navigator does not want more characters
+            def accepts(newchar)
+                returns True if the navigator will accept and 'eat' the new character
+            def accept(matched, final)
+                called to inform the navigator of a match and whether it is a final word
+            def pop_edge()
+                called when leaving an edge that has been navigated; returns False
+                if there is no need to visit other edges
+            def done()
+                called when the navigation is completed
+
+            Optionally, the navigation object can also implement:
+
+            def edge_char()
+                returns the first character of the only edge that the navigator
+                would enter from the current node, or None if it might enter any
+                edge; push_edge() is then called for that edge only
+        """
+        root = self._root_node()
+        if root is None:
+            # No graph: no navigation
+            nav.done()
+            return
+        Navigation(nav).go(root)
+
+
+class DawgDictionary(_DawgBase):
 
     def __init__(self):
+        super().__init__()
         # Initialize an empty graph
         # The root entry will eventually be self._nodes[0]
         self._nodes = None
         # Running counter of nodes read
         self._index = 1
-        # Lock to ensure that only one thread loads the dictionary
-        self._lock = threading.Lock()
 
     def _parse_and_add(self, line):
         """ Parse a single line of a DAWG text file and add to the graph structure """
         # The first line is the root (by convention nodeid 0)
         # The first non-root node is in line 2 and has nodeid 2
-        assert self._nodes is not None
+        nodes = self._nodes
+        assert nodes is not None
+        intern = sys.intern
         nodeid = self._index if self._index > 1 else 0
         self._index += 1
         edgedata = line.split("_")
-        final = False
-        firstedge = 0
-        if len(edgedata) >= 1 and edgedata[0] == "|":
-            # Vertical bar denotes final node
-            final = True
-            firstedge = 1
-        if nodeid in self._nodes:
-            # We have already seen this node id: use the previously created instance
-            newnode = self._nodes[nodeid]
-        else:
+        # A leading vertical bar denotes a final node
+        final = edgedata[0] == "|"
+        newnode = nodes[nodeid]
+        if newnode is None:
             # The id is appearing for the first time: add it
-            newnode = _Node()
-            self._nodes[nodeid] = newnode
+            newnode = nodes[nodeid] = _Node()
         newnode.final = final
         # Process the edges
-        for edge in edgedata[firstedge:]:
-            e = edge.split(":")
-            prefix = e[0]
-            edgeid = int(e[1])
-            if edgeid == 0:
+        prefixes = []
+        children = []
+        for edge in edgedata[1:] if final else edgedata:
+            prefix, edgeid = edge.split(":")
+            # Many edges share the same prefix: keep only one copy of each
+            prefixes.append(intern(prefix))
+            if edgeid == "0":
                 # Edge leads to null/zero, i.e. is final
-                newnode.edges[prefix] = None
-            elif edgeid in self._nodes:
-                # Edge leads to a node we've already seen
-                newnode.edges[prefix] = self._nodes[edgeid]
+                children.append(None)
             else:
-                # Edge leads to a new, previously unseen node: Create it
-                newterminal = _Node()
-                newnode.edges[prefix] = newterminal
-                self._nodes[edgeid] = newterminal
+                edgeid = int(edgeid)
+                terminal = nodes[edgeid]
+                if terminal is None:
+                    # Edge leads to a new, previously unseen node: Create it
+                    terminal = nodes[edgeid] = _Node()
+                children.append(terminal)
+        newnode.set_edges(prefixes, children)
 
     def load(self, fname):
         """ Load a DAWG from a text file """
@@ -130,23 +283,72 @@ class DawgDictionary:
             if self._nodes is not None:
                 # Already loaded
                 return
-            self._nodes = dict()
+            # Read the whole file in one go, which is considerably faster than
+            # iterating over it line by line. Text mode translates CRLF
+            # (Windows-style) line endings to LF (Unix-style).
+            with open(fname, mode="r", encoding="utf-8") as fin:
+                lines = fin.read().split("\n")
+            # Node ids are line numbers, so they are dense and cannot exceed
+            # the number of lines: keep the nodes in a list indexed by id
+            self._nodes = [None] * (len(lines) + 1)
             self._index = 1
-            with codecs.open(fname, mode="r", encoding="utf-8") as fin:
-                for line in fin:
-                    if line.endswith("\r\n"):
-                        # Cut off trailing CRLF (Windows-style)
-                        line = line[0:-2]
-                    elif line.endswith("\n"):
-                        # Cut off trailing LF (Unix-style)
-                        line = line[0:-1]
+            with _gc_paused():
+                parse_and_add = self._parse_and_add
+                for line in lines:
                     if line:
-                        self._parse_and_add(line)
+                        parse_and_add(line)
+            # Drop the unused ids, i.e. 1 and any beyond the last line,
+            # keeping the root first
+            self._nodes = [node for node in self._nodes if node is not None]
 
     def store_pickle(self, fname):
-        """ Store a DAWG in a Python pickle file """
+        """ Store a DAWG in a Python pickle file, flattened into arrays """
+        # Number the nodes consecutively from 1, with the root first;
+        # zero denotes a null (final) edge target. The nodes are numbered
+        # in breadth-first order, so that the children of a node are mostly
+        # numbered (and thus allocated by load_pickle()) contiguously.
+        root = self._nodes[0]
+        nodes = [root]
+        index = {id(root): 1}
+        for node in nodes:
+            for child in node.children:
+                if child is not None and id(child) not in index:
+                    nodes.append(child)
+                    index[id(child)] = len(nodes)
+        finals = bytes(node.final for node in nodes)
+        counts = array.array("H")
+        # Each distinct prefix string is stored only once
+        prefixes = dict()
+        prefix_ix = array.array("I")
+        children = array.array("I")
+        for node in nodes:
+            counts.append(len(node.prefixes))
+            for prefix, child in zip(node.prefixes, node.children):
+                prefix_ix.append(prefixes.setdefault(prefix, len(prefixes)))
+                children.append(0 if child is None else index[id(child)])
+        flat = (finals, counts, list(prefixes), prefix_ix, children)
         with open(fname, "wb") as pf:
-            pickle.dump(self._nodes, pf, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(flat, pf, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _unflatten(flat):
+        """ Rebuild the graph from the arrays written by store_pickle() """
+        finals, counts, prefixes, prefix_ix, children = flat
+        nodes = [None]
+        for final in finals:
+            node = _Node()
+            node.final = bool(final)
+            nodes.append(node)
+        pos = 0
+        for node, count in zip(nodes[1:], counts):
+            end = pos + count
+            node.set_edges(
+                [prefixes[ix] for ix in prefix_ix[pos:end]],
+                [nodes[child] for child in children[pos:end]],
+            )
+            pos = end
+        # The root is node 0
+        return nodes[1:]
 
     def load_pickle(self, fname):
         """ Load a DAWG from a Python pickle file """
@@ -154,69 +356,268 @@ class DawgDictionary:
             if self._nodes is not None:
                 # Already loaded
                 return
-            with open(fname, "rb") as pf:
-                self._nodes = pickle.load(pf)
+            with open(fname, "rb") as pf, _gc_paused():
+                self._nodes = self._unpickle(pf)
+
+    @staticmethod
+    def _unpickle(pf):
+        """ Read the graph from an open pickle file """
+        flat = pickle.load(pf)
+        if isinstance(flat, dict):
+            # Older pickle file containing the node graph itself,
+            # converted by _Node.__setstate__()
+            return flat
+        return DawgDictionary._unflatten(flat)
 
     def num_nodes(self):
         """ Return a count of unique nodes in the DAWG """
         return 0 if self._nodes is None else len(self._nodes)
 
+    def _root_node(self):
+        """ Return the root node, or None if no graph has been loaded """
+        return None if self._nodes is None else self._nodes[0]
+
     def find(self, word):
         """ Look for a word in the graph, returning True if it is found or False if not """
-        nav = FindNavigator(word)
-        self.navigate(nav)
-        return nav.is_found()
-
-    def __contains__(self, word):
-        """ Enable simple lookup syntax: "word" in dawgdict """
-        return self.find(word)
+        if self._nodes is None or not word:
+            return False
+        return self._find_from(self._nodes[0], word, 0, None)
+
+    def find_many(self, words):
+        """ Look for several words in the graph, returning a list of True/False
+            values corresponding to the words. The words are looked up in sorted
+            order, resuming each walk through the graph from the deepest node
+            that is shared with the previous word. """
+        result = [False] * len(words)
+        if self._nodes is None:
+            return result
+        # The path of the previous word, as (word index, node) tuples
+        # for each node entered along the way
+        path = [(0, self._nodes[0])]
+        prev = ""
+        for ix in sorted(range(len(words)), key=words.__getitem__):
+            word = words[ix]
+            if not word:
+                continue
+            # Find the length of the common prefix with the previous word
+            common = 0
+            for a, b in zip(prev, word):
+                if a != b:
+                    break
+                common += 1
+            # Back up to the deepest node within the common prefix
+            while path[-1][0] > common:
+                path.pop()
+            i, node = path[-1]
+            if i == len(word):
+                # The word ends where the node starts
+                result[ix] = node.final
+            else:
+                result[ix] = self._find_from(node, word, i, path)
+            prev = word
+        return result
 
-    def find_matches(self, pattern, sort=True):
-        """ Returns a list of words matching a pattern.
-            The pattern contains characters and '?'-signs denoting wildcards.
-            Characters are matched exactly, while the wildcards match any character.
-        """
-        nav = MatchNavigator(pattern, sort)
-        self.navigate(nav)
-        return nav.result()
+    @staticmethod
+    def _find_from(node, word, i, path):
+        """ Walk the graph from the given node, which has been reached
+            via word[0:i], looking for the rest of the word. If path is
+            a list, a (word index, node) tuple is appended to it for
+            each node entered along the way. """
+        # This is a direct walk of the graph, equivalent to navigating
+        # with a FindNavigator but without the navigator protocol overhead
+        lenw = len(word)
+        while True:
+            # Find the outgoing edge that starts with the next letter of the word
+            ix = node.firsts.find(word[i])
+            if ix < 0:
+                return False
+            prefix = node.prefixes[ix]
+            nextnode = node.children[ix]
+            if "|" not in prefix:
+                # Most prefixes contain no vertical bars, and can be
+                # compared with the word in a single C-level operation
+                if not word.startswith(prefix, i):
+                    # Mismatch, or the word ends within the prefix,
+                    # where there is no word end
+                    return False
+                i += len(prefix)
+                if i == lenw:
+                    # The word ends at the end of the prefix: it is found
+                    # if the next node is final
+                    return nextnode is None or nextnode.final
+            else:
+                # Match the prefix against the word, letter by letter
+                lenp = len(prefix)
+                j = 0
+                while j < lenp:
+                    if prefix[j] != word[i]:
+                        return False
+                    i += 1
+                    j += 1
+                    if j < lenp and prefix[j] == "|":
+                        # A vertical bar marks the end of a word
+                        if i == lenw:
+                            return True
+                        j += 1
+                    elif i == lenw:
+                        # The word ends here: it is found if we're at the end
+                        # of the prefix and the next node is final
+                        return j == lenp and (nextnode is None or nextnode.final)
+            if nextnode is None:
+                # The word is longer than the path through the graph
+                return False
+            node = nextnode
+            if path is not None:
+                path.append((i, node))
+
+class PackedDawgDictionary(_DawgBase):
+
+    """ A DAWG dictionary that navigates a packed binary file,
+        as written by _BinaryDawgPacker in dawgbuilder.py, directly
+        from a read-only memory map. No parsing takes place at load time. """
+
+    # Prefix characters are coded as indices into the alphabet
+    _CODING = Alphabet.order
+    _CODES = {ch: i for i, ch in enumerate(_CODING)}
+    # Node locations are little-endian unsigned 32-bit integers
+    _loc_from = struct.Struct("<L").unpack_from
 
-    def find_permutations(self, rack, minlen=0):
-        """ Returns a list of legal permutations of a rack of letters.
-            The list is sorted in descending order by permutation length.
-            The rack may contain question marks '?' as wildcards, matching all letters.
-            Question marks should be used carefully as they can
-            yield very large result sets.
-        """
-        nav = PermutationNavigator(rack, minlen)
-        self.navigate(nav)
-        return nav.result()
+    def __init__(self):
+        super().__init__()
+        self._buf = None
+        # Cache of nodes decoded so far, keyed by location
+        self._nodes = None
+        self._root = None
+
+    def _child(self, loc):
+        """ Return the node at the given location, or None for a final null node """
+        if loc == 0:
+            return None
+        node = self._nodes.get(loc)
+        if node is None:
+            # The high bit of the node header is the final flag
+            node = self._nodes[loc] = _PackedNode(self, loc, self._buf[loc] >= 0x80)
+        return node
+
+    def _decode_edges(self, loc):
+        """ Decode the edges of the node at the given location,
+            returning a tuple of prefixes and a tuple of next nodes """
+        buf = self._buf
+        coding = self._CODING
+        loc_from = self._loc_from
+        child = self._child
+        # The root edge count is stored as a plain byte at location 0;
+        # other nodes have the edge count in the low 7 bits of the header
+        num_edges = buf[0] if loc == 0 else buf[loc] & 0x7F
+        pos = loc + 1
+        prefixes = []
+        children = []
+        for _ in range(num_edges):
+            h = buf[pos]
+            pos += 1
+            if h & 0x40:
+                # Single-letter prefix, stored in the header itself
+                prefix = coding[h & 0x3F]
+            else:
+                # Multi-letter prefix, with the final bit set on
+                # characters that are followed by a vertical bar
+                n = h & 0x3F
+                prefix = "".join(
+                    coding[c & 0x7F] + "|" if c & 0x80 else coding[c]
+                    for c in buf[pos : pos + n]
+                )
+                pos += n
+            prefixes.append(sys.intern(prefix))
+            children.append(child(loc_from(buf, pos)[0]))
+            pos += 4
+        return tuple(prefixes), tuple(children)
 
-    def navigate(self, nav):
-        """ A generic function to navigate through the DAWG under
-            the control of a navigation object.
+    def find(self, word):
+        """ Look for a word in the graph, returning True if it is found or False if not.
+            This walks the packed buffer directly, as a plain integer loop,
+            without decoding nodes or going through a navigator. """
+        buf = self._buf
+        if buf is None or not word:
+            return False
+        codes = self._CODES
+        try:
+            word = [codes[ch] for ch in word]
+        except KeyError:
+            # Not a letter of the alphabet: cannot be in the graph
+            return False
+        lenw = len(word)
+        loc_from = self._loc_from
+        i = 0
+        # Start with the root edges, whose count is a plain byte at location 0
+        num_edges = buf[0]
+        pos = 1
+        while True:
+            c = word[i]
+            for _ in range(num_edges):
+                h = buf[pos]
+                if h & 0x40:
+                    # Single-letter prefix, stored in the header itself
+                    if h & 0x3F == c:
+                        i += 1
+                        loc = loc_from(buf, pos + 1)[0]
+                        break
+                    pos += 5
+                    continue
+                n = h & 0x3F
+                if buf[pos + 1] & 0x7F != c:
+                    pos += n + 5
+                    continue
+                # The first letter matches: the rest of the prefix must match as well
+                for k in range(pos + 1, pos + 1 + n):
+                    b = buf[k]
+                    if b & 0x7F != word[i]:
+                        return False
+                    i += 1
+                    if i == lenw and k < pos + n:
+                        # The word ends within the prefix: is this letter final?
+                        return b >= 0x80
+                loc = loc_from(buf, pos + 1 + n)[0]
+                break
+            else:
+                # No edge starts with the next letter of the word
+                return False
+            if i == lenw:
+                # The word ends at the end of the prefix
+                return loc == 0 or buf[loc] >= 0x80
+            if loc == 0:
+                # The word is longer than the path through the graph
+                return False
+            # Continue with the edges of the next node
+            num_edges = buf[loc] & 0x7F
+            pos = loc + 1
+
+    def find_many(self, words):
+        """ Look for several words in the graph, returning a list of
+            True/False values corresponding to the words """
+        find = self.find
+        return [find(word) for word in words]
 
-            The navigation object should implement the following interface:
+    def load(self, fname):
+        """ Load a DAWG from a packed binary file, by memory-mapping it """
+        with self._lock:
+            if self._buf is not None:
+                # Already loaded
+                return
+            with open(fname, "rb") as f:
+                # The map remains valid after the file is closed
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_WILLNEED"):
+                # The file is small and will be accessed at random: ask the
+                # kernel to start reading all of it in the background now,
+                # instead of page by page as queries happen to touch it
+                buf.madvise(mmap.MADV_WILLNEED)
+            self._nodes = dict()
+            self._root = _PackedNode(self, 0, False)
+            self._buf = buf
 
-            def push_edge(firstchar)
-                returns True if the edge should be entered or False if not
-            def accepting()
-                returns False if the navigator does not want more characters
-            def accepts(newchar)
-                returns True if the navigator will accept and 'eat' the new character
-            def accept(matched, final)
-                called to inform the navigator of a match and whether it is a final word
-            def pop_edge()
-                called when leaving an edge that has been navigated; returns False
-                if there is no need to visit other edges
-            def done()
-                called when the navigation is completed
-        """
-        if self._nodes is None:
-            # No graph: no navigation
-            nav.done()
-            return
-        root = self._nodes[0]  # Start at the root
-        Navigation(nav).go(root)
+    def _root_node(self):
+        """ Return the root node, or None if no file has been loaded """
+        return self._root
 
 
 class Wordbase:
@@ -228,14 +629,17 @@ class Wordbase:
 
     @staticmethod
     def _load():
-        """ Load a DawgDictionary, from either a text file or a pickle file """
+        """ Load a DawgDictionary, from either a text file, a pickle file
+            or a packed binary file """
         with Wordbase._lock:
             if Wordbase._dawg is not None:
                 # Already loaded: nothing to do
                 return
-            # Compare the file times of the text version vs. the pickled version
+            # Compare the file times of the text version vs. the pickled
+            # and packed versions
             fname = os.path.abspath(os.path.join("resources", "ordalisti.text.dawg"))
             pname = os.path.abspath(os.path.join("resources", "ordalisti.dawg.pickle"))
+            bname = os.path.abspath(os.path.join("resources", "ordalisti.dawg"))
             try:
                 fname_t = os.path.getmtime(fname)
             except os.error:
@@ -244,11 +648,28 @@ class Wordbase:
                 pname_t = os.path.getmtime(pname)
             except os.error:
                 pname_t = None
+            try:
+                bname_t = os.path.getmtime(bname)
+            except os.error:
+                bname_t = None
 
-            dawg = DawgDictionary()
-
-            if fname_t is None or (pname_t is not None and pname_t >= fname_t):
+            if bname_t is not None and (fname_t is None or bname_t >= fname_t):
+                # We have a newer packed binary file: memory-map it
+                dawg = PackedDawgDictionary()
+                logging.info(
+                    "Instance {0} loading DAWG from packed file {1}".format(
+                        os.environ.get("INSTANCE_ID", ""), bname
+                    )
+                )
+                t0 = time.time()
+                dawg.load(bname)
+                t1 = time.time()
+                logging.info(
+                    "Mapped packed graph in {0:.2f} seconds".format(t1 - t0)
+                )
+            elif fname_t is None or (pname_t is not None and pname_t >= fname_t):
                 # We have a newer pickle file: use it
+                dawg = DawgDictionary()
                 logging.info(
                     "Instance {0} loading DAWG from pickle file {1}".format(
                         os.environ.get("INSTANCE_ID", ""), pname
@@ -265,6 +686,7 @@ class Wordbase:
             else:
                 # Load in the traditional way, from the text file
                 assert fname_t is not None
+                dawg = DawgDictionary()
                 logging.info(
                     "Instance {0} loading DAWG from text file {1}".format(
                         os.environ.get("INSTANCE_ID", ""), fname
@@ -282,6 +704,14 @@ class Wordbase:
             # Do not assign Wordbase._dawg until fully loaded, to prevent race conditions
             Wordbase._dawg = dawg
 
+    @staticmethod
+    def load_async():
+        """ Start loading the word database in a background thread, so that it
+            is likely to be ready when first needed. If dawg() is called before
+            the load completes, it waits for it on the same lock. """
+        if Wordbase._dawg is None:
+            threading.Thread(target=Wordbase._load, daemon=True).start()
+
     @staticmethod
     def dawg():
         if Wordbase._dawg is None:
@@ -300,59 +730,125 @@ class Navigation:
         # note it and call it with additional state information instead of
         # plain accept()
         self._resumable = callable(getattr(nav, "accept_resumable", None))
-
-    def _navigate_from_node(self, node, matched):
-        """ Starting from a given node, navigate outgoing edges """
-        # Go through the edges of this node and follow the ones
-        # okayed by the navigator
-        for prefix, nextnode in node.edges.items():
-            if self._nav.push_edge(prefix[0]):
-                # This edge is a candidate: navigate through it
-                self._navigate_from_edge(prefix, nextnode, matched)
-                if not self._nav.pop_edge():
+        # Cache the navigator's bound methods, as they are called
+        # very frequently within the navigation loops
+        self._push_edge = nav.push_edge
+        self._pop_edge = nav.pop_edge
+        self._accepting = nav.accepting
+        self._accepts = nav.accepts
+        self._accept = nav.accept_resumable if self._resumable else nav.accept
+        # If the navigator has a method called edge_char(), it can tell us
+        # in advance which single edge of a node it wants to enter, if any.
+        # The edge is then located directly instead of offering each edge
+        # of the node in turn to push_edge().
+        edge_char = getattr(nav, "edge_char", None)
+        self._edge_char = edge_char if callable(edge_char) else None
+
+    def _edges(self, node):
+        """ Return an iterator over the (first character, prefix, next node)
+            triples of the edges of a node that the navigator may enter """
+        if self._edge_char is not None:
+            ch = self._edge_char()
+            if ch is not None:
+                # Only the edge starting with ch is of interest
+                ix = node.firsts.find(ch)
+                if ix < 0:
+                    return iter(())
+                return iter(((ch, node.prefixes[ix], node.children[ix]),))
+        return zip(node.firsts, node.prefixes, node.children)
+
+    def _navigate(self, edges, matched, resumed=False):
+        """ Navigate along the given edges and onwards into the nodes they lead to.
+            If resumed is True, edges contains a single edge that the navigator
+            had already entered when the navigation was suspended, so push_edge()
+            and pop_edge() are not called for it. """
+        # The graph is traversed depth-first using an explicit stack
+        # of (edge iterator, matched) tuples instead of recursion.
+        # The edge iterator yields (first character, prefix, next node)
+        # triples from the parallel edge sequences of a node.
+        edges_of = self._edges if self._edge_char is not None else None
+        push_edge = self._push_edge
+        pop_edge = self._pop_edge
+        accepting = self._accepting
+        accepts = self._accepts
+        accept = self._accept
+        resumable = self._resumable
+        # The navigator enters and leaves all edges, except a resumed one
+        outer = not resumed
+        stack = []
+        while True:
+            # Go through the edges of this node and follow the ones
+            # okayed by the navigator
+            descend = False
+            for firstchar, prefix, nextnode in edges:
+                if (outer or stack) and not push_edge(firstchar):
+                    continue
+                # This edge is a candidate: navigate along it
+                # for as long as the navigator is accepting
+                lenp = len(prefix)
+                j = 0
+                m = matched
+                while j < lenp and accepting():
+                    # See if the navigator is OK with accepting the current character
+                    ch = prefix[j]
+                    if not accepts(ch):
+                        # Nope: we're done with this edge
+                        break
+                    # So far, we have a match: add a letter to the matched path.
+                    # (The navigator receives the matched string at every letter,
+                    # so a plain str is cheaper here than a mutable byte buffer
+                    # that would have to be decoded for each call.)
+                    m += ch
+                    j += 1
+                    # Check whether the next prefix character is a vertical bar, denoting finality
+                    final = False
+                    if j < lenp and prefix[j] == "|":
+                        final = True
+                        j += 1
+                    elif (j >= lenp) and ((nextnode is None) or nextnode.final):
+                        # If we're at the final char of the prefix and the next node is final,
+                        # set the final flag as well (there is no trailing vertical bar in this case)
+                        final = True
+                    # Tell the navigator where we are
+                    if resumable:
+                        # The navigator wants to know the position in the graph
+                        # so that navigation can be resumed later from this spot
+                        accept(prefix[j:], nextnode, m)
+                    else:
+                        # Normal navigator: tell it about the match
+                        accept(m, final)
+                else:
+                    if j >= lenp and accepting() and (nextnode is not None):
+                        # Gone through the entire edge and still accepting:
+                        # descend into the next node, remembering where we were
+                        stack.append((edges, matched))
+                        if edges_of is None:
+                            edges = zip(
+                                nextnode.firsts, nextnode.prefixes, nextnode.children
+                            )
+                        else:
+                            edges = edges_of(nextnode)
+                        matched = m
+                        descend = True
+                        break
+                if (outer or stack) and not pop_edge():
                     # Short-circuit and finish the loop if pop_edge() returns False
                     break
-
-    def _navigate_from_edge(self, prefix, nextnode, matched):
-        """ Navigate along an edge, accepting partial and full matches """
-        # Go along the edge as long as the navigator is accepting
-        lenp = len(prefix)
-        j = 0
-        while j < lenp and self._nav.accepting():
-            # See if the navigator is OK with accepting the current character
-            if not self._nav.accepts(prefix[j]):
-                # Nope: we're done with this edge
-                return
-            # So far, we have a match: add a letter to the matched path
-            matched += prefix[j]
-            j += 1
-            # Check whether the next prefix character is a vertical bar, denoting finality
-            final = False
-            if j < lenp and prefix[j] == "|":
-                final = True
-                j += 1
-            elif (j >= lenp) and ((nextnode is None) or nextnode.final):
-                # If we're at the final char of the prefix and the next node is final,
-                # set the final flag as well (there is no trailing vertical bar in this case)
-                final = True
-            # Tell the navigator where we are
-            if self._resumable:
-                # The navigator wants to know the position in the graph
-                # so that navigation can be resumed later from this spot
-                self._nav.accept_resumable(prefix[j:], nextnode, matched)
+            if descend:
+                # Continue with the edges of the next node
+                continue
+            # Ascend until we reach a node that has more edges to visit
+            while stack:
+                edges, matched = stack.pop()
+                if not (outer or stack):
+                    # Back at the resumed edge: we're done
+                    return
+                # We're leaving the edge that led to the finished node
+                if pop_edge():
+                    break
             else:
-                # Normal navigator: tell it about the match
-                self._nav.accept(matched, final)
-        # We're done following the prefix for as long as it goes and
-        # as long as the navigator was accepting
-        if j < lenp:
-            # We didn't complete the prefix, so the navigator must no longer
-            # be interested (accepting): we're done
-            return
-        if self._nav.accepting() and (nextnode is not None):
-            # Gone through the entire edge and still have rack letters left:
-            # continue with the next node
-            self._navigate_from_node(nextnode, matched)
+                # Back at the starting edges: we're done
+                return
 
     def go(self, root):
         """ Perform the navigation using the given navigator """
@@ -361,14 +857,14 @@ class Navigation:
             self._nav.done()
             return
         # The ship is ready to go
-        if self._nav.accepting():
+        if self._accepting():
             # Leave shore and navigate the open seas
-            self._navigate_from_node(root, "")
+            self._navigate(self._edges(root), "")
         self._nav.done()
 
     def resume(self, prefix, nextnode, matched):
         """ Resume navigation from a previously saved state """
-        self._navigate_from_edge(prefix, nextnode, matched)
+        self._navigate(iter(((None, prefix, nextnode),)), matched, resumed=True)
 
 
 class FindNavigator:
@@ -388,6 +884,10 @@ class FindNavigator:
         # Enter the edge if it fits where we are in the word
         return self._word[self._index] == firstchar
 
+    def edge_char(self):
+        """ Returns the first character of the only edge to enter from the current node """
+        return self._word[self._index]
+
     def accepting(self):
         """ Returns False if the navigator does not want more characters """
         # Don't go too deep
@@ -437,10 +937,11 @@ class PermutationNavigator:
         """ Returns True if the edge should be entered or False if not """
         # Follow all edges that match a letter in the rack
         # (which can be '?', matching all edges)
-        if not ((firstchar in self._rack) or ("?" in self._rack)):
+        rack = self._rack
+        if firstchar not in rack and "?" not in rack:
             return False
         # Fit: save our rack and move into the edge
-        self._stack.append(self._rack)
+        self._stack.append(rack)
         return True
 
     def accepting(self):
@@ -450,15 +951,22 @@ class PermutationNavigator:
 
     def accepts(self, newchar):
         """ Returns True if the navigator will accept the new character """
-        exactmatch = newchar in self._rack
-        if (not exactmatch) and ("?" not in self._rack):
+        # The rack is a short string, so the membership tests and replace()
+        # calls below run at C speed; this was measured to be faster than
+        # keeping a vector of letter counts, which must be copied on push_edge(),
+        # and also faster than packing the letter counts into bit fields of
+        # an int, which requires a dict lookup per letter and arithmetic on
+        # an int wider than a machine word
+        rack = self._rack
+        if newchar in rack:
+            # We're fine with this: accept the character and remove from the rack
+            self._rack = rack.replace(newchar, "", 1)
+        elif "?" in rack:
+            # Use a wildcard instead
+            self._rack = rack.replace("?", "", 1)
+        else:
             # Can't continue with this prefix - we no longer have rack letters matching it
             return False
-        # We're fine with this: accept the character and remove from the rack
-        if exactmatch:
-            self._rack = self._rack.replace(newchar, "", 1)
-        else:
-            self._rack = self._rack.replace("?", "", 1)
         return True
 
     def accept(self, matched, final):
@@ -474,7 +982,12 @@ class PermutationNavigator:
 
     def done(self):
         """ Called when the whole navigation is done """
-        self._result.sort(key=lambda x: (-len(x), Alphabet.sortkey(x)))
+        # The graph is traversed depth-first with the edges of each node in
+        # collation order (as written by dawgbuilder.py), so the words arrive
+        # in Alphabet.sortkey() order already. A stable sort by descending
+        # length therefore yields the (-len, sortkey) order without
+        # calculating a sort key for each word.
+        self._result.sort(key=len, reverse=True)
 
     def result(self):
         return self._result
@@ -486,26 +999,32 @@ class MatchNavigator:
         to find all words matching a pattern
     """
 
-    def __init__(self, pattern, sort):
+    def __init__(self, pattern):
         self._pattern = pattern
         self._lenp = len(pattern)
         self._index = 0
-        self._chmatch = pattern[0]
-        self._wildcard = self._chmatch == "?"
+        # The letter required at each position of the pattern,
+        # or None if the position is a wildcard
+        self._allowed = [None if ch == "?" else ch for ch in pattern]
         self._stack = []
         self._result = []
-        self._sort = sort
 
     def push_edge(self, firstchar):
         """ Returns True if the edge should be entered or False if not """
         # Follow all edges that match a letter in the rack
         # (which can be '?', matching all edges)
-        if not self._wildcard and (firstchar != self._chmatch):
+        allowed = self._allowed[self._index]
+        if allowed is not None and allowed != firstchar:
             return False
         # Fit: save our index and move into the edge
-        self._stack.append((self._index, self._chmatch, self._wildcard))
+        self._stack.append(self._index)
         return True
 
+    def edge_char(self):
+        """ Returns the first character of the only edge to enter from
+            the current node, or None if this is a wildcard position """
+        return self._allowed[self._index]
+
     def accepting(self):
         """ Returns False if the navigator does not want more characters """
         # Continue as long as there is something left to match
@@ -513,12 +1032,10 @@ class MatchNavigator:
 
     def accepts(self, newchar):
         """ Returns True if the navigator will accept the new character """
-        if not self._wildcard and (newchar != self._chmatch):
+        allowed = self._allowed[self._index]
+        if allowed is not None and allowed != newchar:
             return False
         self._index += 1
-        if self._index < self._lenp:
-            self._chmatch = self._pattern[self._index]
-            self._wildcard = self._chmatch == "?"
         return True
 
     def accept(self, matched, final):
@@ -530,14 +1047,16 @@ class MatchNavigator:
 
     def pop_edge(self):
         """ Called when leaving an edge that has been navigated """
-        self._index, self._chmatch, self._wildcard = self._stack.pop()
+        self._index = self._stack.pop()
         # We need to continue visiting edges only if this is a wildcard position
-        return self._wildcard
+        return self._allowed[self._index] is None
 
     def done(self):
         """ Called when the whole navigation is done """
-        if self._sort:
-            self._result.sort(key=Alphabet.sortkey)
+        # The words arrive in Alphabet.sortkey() order already, since the graph
+        # is traversed depth-first with the edges of each node in collation
+        # order (see PermutationNavigator.done()), so there is nothing to do
+        pass
 
     def result(self):
         return self._result
@@ -13,7 +13,7 @@ from __future__ import print_function
 import os
 import time
 
-from dawgdictionary import DawgDictionary
+from dawgdictionary import DawgDictionary, PackedDawgDictionary
 from languages import Alphabet
 
 
@@ -35,19 +35,40 @@ class DawgTester:
             print(u"Error: \"{0}\" was found".format(word))
 
     def run(self, fname, relpath):
-        """ Load a DawgDictionary and test its functionality """
+        """ Load the DAWG in each of its forms and test its functionality """
 
         print("DawgDictionary tester")
         print("Author: Vilhjalmur Thorsteinsson")
         print()
 
-        self._dawg = DawgDictionary()
-        fpath = os.path.abspath(os.path.join(relpath, fname + ".dawg.pickle"))
-        t0 = time.time()
-        self._dawg.load_pickle(fpath)
-        t1 = time.time()
+        # The packed binary file is the one that Wordbase prefers,
+        # but the pickle and text files are tested as well
+        forms = [
+            ("pickle", ".dawg.pickle", DawgDictionary, "load_pickle"),
+            ("text", ".text.dawg", DawgDictionary, "load"),
+            ("packed", ".dawg", PackedDawgDictionary, "load"),
+        ]
+        for form, suffix, cls, loader in forms:
+            fpath = os.path.abspath(os.path.join(relpath, fname + suffix))
+            if not os.path.exists(fpath):
+                print("No {0} file found at {1}".format(form, fpath))
+                print()
+                continue
+            self._dawg = cls()
+            t0 = time.time()
+            getattr(self._dawg, loader)(fpath)
+            t1 = time.time()
+
+            print("DAWG loaded from {0} file in {1:.2f} seconds".format(form, t1 - t0))
 
-        print("DAWG loaded in {0:.2f} seconds".format(t1 - t0))
+            self._check()
+
+        print(u"Test finished")
+
+        self._dawg = None
+
+    def _check(self):
+        """ Test the functionality of the loaded DAWG """
 
         print("Checking a set of random words:")
         self._test_true(u"abbadísarinnar")
@@ -209,14 +230,30 @@ class DawgTester:
 
         print("Checking small words:")
 
-        # Check all possible two-letter combinations, allowing only those in the list
-        for first in Alphabet.order:
-            for second in Alphabet.order:
-                word = first + second
-                if word in smallwords:
-                    self._test_true(word)
-                else:
-                    self._test_false(word)
+        # Check all possible two-letter combinations, allowing only those in the list.
+        # The combinations are looked up in a single batch, which shares the walk
+        # through the graph between words that have the same first letter.
+        combinations = [first + second for first in Alphabet.order for second in Alphabet.order]
+        smallset = set(smallwords)
+        for word, found in zip(combinations, self._dawg.find_many(combinations)):
+            if word in smallset:
+                if not found:
+                    print(u"Error: \"{0}\" was not found".format(word))
+            elif found:
+                print(u"Error: \"{0}\" was found".format(word))
+
+        print("Checking find_many() against find():")
+
+        # Mix the two-letter combinations with words and their one-letter
+        # extensions, most of which are not found
+        words = list(combinations)
+        for word in self._dawg.find_permutations(u"einstök"):
+            words.append(word)
+            words.extend(word + ch for ch in Alphabet.order)
+        words.extend([u"", u"abo550", u"abstraktmálari"])
+        for word, found in zip(words, self._dawg.find_many(words)):
+            if found != self._dawg.find(word):
+                print(u"Error: find_many() and find() disagree on \"{0}\"".format(word))
 
         print("Finding permutations:")
         t0 = time.time()
@@ -288,10 +325,6 @@ class DawgTester:
                 print(u"{0} in match result but not in smallwords".format(word))
         print()
 
-        print(u"Test finished")
-
-        self._dawg = None
-
 
 def test():
     # Test navigation in the DAWG
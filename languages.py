@@ -14,7 +14,6 @@
 """
 
 import sys
-from functools import reduce
 
 
 class Alphabet:
@@ -111,30 +110,41 @@ class Alphabet:
     full_order = "aábcdðeéfghiíjklmnoópqrstuúvwxyýzþæö"
     # Upper case version of the full order string
     full_upper = "AÁBCDÐEÉFGHIÍJKLMNOÓPQRSTUÚVWXYÝZÞÆÖ"
+    # Translation table from upper case to lower case letters
+    _lower_table = str.maketrans(full_upper, full_order)
 
     # Letter bit pattern
     bit = [1 << n for n in range(len(order))]
+    # The bit of each letter, looked up by the letter itself
+    _bit_of = {ch: 1 << n for n, ch in enumerate(order)}
 
     # Locale collation (sorting) map, initialized in _init()
     _lcmap = None  # Case sensitive
     _lcmap_nocase = None  # Case insensitive
+    # The same maps as bytes.translate() tables, initialized in _init()
+    _lctable = None  # Case sensitive
+    _lctable_nocase = None  # Case insensitive
 
     @staticmethod
     def score(tiles):
         """ Return the net (plain) score of the given tiles """
         if not tiles:
             return 0
-        return sum([Alphabet.scores[tile] for tile in tiles])
+        return sum(map(Alphabet.scores.__getitem__, tiles))
 
     @staticmethod
     def bit_pattern(word):
         """ Return a pattern of bits indicating which letters are present in the word """
-        return reduce(lambda x, y: x | y, [Alphabet.bit_of(c) for c in word], 0)
+        bit_of = Alphabet._bit_of
+        pattern = 0
+        for c in word:
+            pattern |= bit_of[c]
+        return pattern
 
     @staticmethod
     def bit_of(c):
         """ Returns the bit corresponding to a character in the alphabet """
-        return Alphabet.bit[Alphabet.order.index(c)]
+        return Alphabet._bit_of[c]
 
     @staticmethod
     def all_bits_set():
@@ -144,21 +154,12 @@ class Alphabet:
     @staticmethod
     def lowercase(ch):
         """ Convert an uppercase character to lowercase """
-        return Alphabet.full_order[Alphabet.full_upper.index(ch)]
+        return ch.translate(Alphabet._lower_table)
 
     @staticmethod
     def tolower(s):
         """ Return the argument string converted to lowercase """
-        return u"".join(
-            [Alphabet.lowercase(c) if c in Alphabet.full_upper else c for c in s]
-        )
-
-    @staticmethod
-    def sortkey(word):
-        """ Return a sort key with the proper lexicographic ordering
-            for the given word, which must be 'pure', i.e. alphabetic. """
-        # This assumes that Alphabet.full_order is correctly ordered in ascending order.
-        return [Alphabet.full_order.index(ch) for ch in word]
+        return s.translate(Alphabet._lower_table)
 
     @staticmethod
     def sort(l):
@@ -173,14 +174,11 @@ class Alphabet:
     @staticmethod
     def string_subtract(a, b):
         """ Subtract all letters in b from a, counting each instance separately """
-        # Note that this cannot be done with sets, as they fold multiple letter instances into one
-        lcount = [a.count(c) - b.count(c) for c in Alphabet.all_tiles]
+        # Note that this cannot be done with sets, as they fold multiple letter instances into one.
+        # Only the tiles that occur in a can remain, so the others are skipped without
+        # counting; a negative count yields an empty string.
         return "".join(
-            [
-                Alphabet.all_tiles[ix] * lcount[ix]
-                for ix in range(len(lcount))
-                if lcount[ix] > 0
-            ]
+            [c * (a.count(c) - b.count(c)) for c in Alphabet.all_tiles if c in a]
         )
 
     @staticmethod
@@ -223,6 +221,7 @@ class Alphabet:
 
         # Now we have a case-sensitive sorting map: copy it
         Alphabet._lcmap = lcmap[:]
+        Alphabet._lctable = bytes(lcmap)
 
         # Create a case-insensitive sorting map, where the lower case
         # characters have the same sort value as the upper case ones
@@ -232,18 +231,29 @@ class Alphabet:
 
         # Store the case-insensitive sorting map
         Alphabet._lcmap_nocase = lcmap
+        Alphabet._lctable_nocase = bytes(lcmap)
 
     @staticmethod
     def sortkey(lstr):
         """ Key function for locale-based sorting """
+        assert Alphabet._lctable
+        # The key is a bytes object, which compares in C; the translation
+        # maps each Latin-1 character to its collation value
+        return lstr.encode('latin-1').translate(Alphabet._lctable)
+
+    @staticmethod
+    def is_codepoint_order():
+        """ Return True if the locale collation is identical to plain code point
+            order, i.e. if strings can be compared directly instead of by sortkey() """
         assert Alphabet._lcmap
-        return [Alphabet._lcmap[b] if b <= 255 else 256 for b in lstr.encode('latin-1')]
+        lcmap = Alphabet._lcmap
+        return all(lcmap[i] < lcmap[i + 1] for i in range(len(lcmap) - 1))
 
     @staticmethod
     def sortkey_nocase(lstr):
         """ Key function for locale-based sorting, case-insensitive """
-        assert Alphabet._lcmap_nocase
-        return [Alphabet._lcmap_nocase[b] if b <= 255 else 256 for b in lstr.encode('latin-1')]
+        assert Alphabet._lctable_nocase
+        return lstr.encode('latin-1').translate(Alphabet._lctable_nocase)
 
 
 # Initialize the locale collation (sorting) map
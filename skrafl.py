@@ -24,8 +24,11 @@ from flask import Flask, render_template, request
 
 import logging
 import time
+from functools import lru_cache
 
 import skraflpermuter
+from dawgdictionary import Wordbase
+from languages import Alphabet
 
 
 # Standard Flask initialization
@@ -33,16 +36,45 @@ import skraflpermuter
 app = Flask(__name__)
 app.config['DEBUG'] = False
 
+# Start loading the word database while the server is starting up,
+# so that the first request does not have to wait for it
+Wordbase.load_async()
+
+
+def _process(rack):
+    """ Create a Tabulator and process the rack with it
+        Returns the Tabulator, or None if the rack was invalid
+    """
+    t = skraflpermuter.Tabulator()
+    return t if t.process(rack) else None
+
+
+# Plain racks tend to recur (for instance via links of the form /?rack=xxx),
+# so their results are cached. This is safe since a Tabulator is not modified
+# after process() returns. Each server worker has its own cache.
+_process_cached = lru_cache(maxsize=64)(_process)
+
+
+def _tabulate(rack):
+    """ Obtain a processed Tabulator for the rack, or None if the rack was invalid """
+    # Normalize the rack so that e.g. 'Hestur' and 'hestur' share a cache entry
+    key = Alphabet.tolower(rack.strip())
+    if key.startswith('=') or any(c in key for c in '?_*'):
+        # Patterns and wildcard racks can yield hundreds of thousands
+        # of words: don't keep their results around after rendering
+        return _process(rack)
+    return _process_cached(key)
+
 
 def _process_rack(rack):
     """ Process a given input rack
         Returns True if OK or False if the rack was invalid, i.e. contains invalid letters
     """
-    # Create a Tabulator to process the rack
-    t = skraflpermuter.Tabulator()
     t0 = time.time()
+    # Obtain a Tabulator with the processed rack
+    t = _tabulate(rack)
 
-    if not t.process(rack):
+    if t is None:
         # Something was wrong with the rack
         # Show the user an error response page
         return render_template("errorword.html", rack=rack)
@@ -61,19 +93,12 @@ def main():
     The page can be invoked via POST from itself, or by a GET, optionally with the
     rack parameter set, i.e. GET /?rack=xxx
     """
-    rack = ""
     if request.method == 'POST':
         # A form POST, probably from the page itself
-        try:
-            rack = request.form['rack']
-        except:
-            rack = ""
+        rack = request.form.get('rack', '')
     else:
         # Presumably a GET: look at the URL parameters
-        try:
-            rack = request.args.get('rack', '')
-        except:
-            rack = ""
+        rack = request.args.get('rack', '')
     if rack:
         rack = rack[0:15]
         # We have something to do: process the entered rack
@@ -134,6 +134,7 @@ class Tabulator:
         self._highscore = 0
         self._highwords = []
         self._combinations = { }
+        self._sorted_combinations = [] # Combinations sorted in alphabetical order
         self._rack = ""
         self._rack_is_valid = False # True if the rack is itself a valid word
         self._pattern = False # True if the result is a pattern match ('=')
@@ -158,7 +159,9 @@ class Tabulator:
         self._highscore = 0
         self._highwords = []
         self._combinations = { }
+        self._sorted_combinations = []
         self._rack = ""
+        self._rack_is_valid = False
         self._pattern = False
         # Do a sanity check on the input by calculating its raw score, thereby
         # checking whether all the letters are valid
@@ -173,11 +176,9 @@ class Tabulator:
         # Sanitize the rack, converting upper case to lower case and
         # catching invalid characters
         try:
-            for c in rack:
-                ch = c
-                if ch in Alphabet.upper:
-                    # Uppercase: find corresponding lowercase letter
-                    ch = Alphabet.lowercase(ch)
+            # Convert uppercase letters to lowercase in a single pass.
+            # Letters that are not in the alphabet, either way, are caught below.
+            for ch in Alphabet.tolower(rack):
                 if ch in '?_*':
                     # This is one of the allowed wildcard characters
                     wildcards += 1
@@ -207,6 +208,15 @@ class Tabulator:
                         # Find out which letter was added
                         addedletter = Alphabet.string_subtract(word, self._rack)
                         self._add_combination(addedletter, word)
+                    elif word == self._rack:
+                        # The rack itself is a valid word: note it here,
+                        # saving a separate lookup when the result is shown
+                        self._rack_is_valid = True
+            # Sort the combinations properly in alphabetical order, once,
+            # since the result page asks for them more than once
+            lc = list(self._combinations.items())
+            lc.sort(key = lambda x: Alphabet.order.index(x[0]))
+            self._sorted_combinations = lc
         # Check permutations
         # The shortest possible rack to check for permutations is 2 letters
         if len(self._rack) < 2:
@@ -239,7 +249,7 @@ class Tabulator:
         if word is None:
             return 0
         try:
-            s = sum(Alphabet.scores[c] for c in word)
+            s = Alphabet.score(word)
         except KeyError:
             # Word contains an unrecognized letter: return a zero score
             s = 0
@@ -268,6 +278,10 @@ class Tabulator:
         """ Returns a display form of the rack that was tabulated """
         return ('= ' + self._rack) if self._pattern else self._rack
 
+    def rack_is_valid(self):
+        """ Returns True if the rack that was tabulated is itself a valid word """
+        return self._rack_is_valid
+
     def count(self):
         """ Returns a count of all valid letter permutations in the rack """
         return self._counter
@@ -288,13 +302,8 @@ class Tabulator:
         """ Returns a list of the combinations possible with additional letters.
         The list contains (ch, wordlist) tuples where ch is the additional letter
         and wordlist is a list of legal words that can be formed with that letter. """
-        lc = list(self._combinations.items())
-        if lc:
-            # Sort the combinations properly in alphabetical order before returning them
-           lc.sort(key = lambda x: Alphabet.order.index(x[0]))
-           return lc
-        # No combinations
-        return None
+        # Return None if there are no combinations
+        return self._sorted_combinations or None
 
     def is_valid_word(self, word):
         """ Checks whether a word is valid """